@@ -0,0 +1,136 @@
+# admission.py - Admission control for webhook signals (secret check, rate limiting, load shedding)
+import hmac
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class AdmissionController:
+    """Decides which webhook requests may reach the trading logic"""
+
+    def __init__(self, secret=None, rate=0.2, burst=3, max_pending=2, max_sources=1000):
+        """
+        Initialize admission controller
+
+        Args:
+            secret: Shared secret webhooks must present (None disables the check)
+            rate: Tokens added per second to each source's bucket
+            burst: Bucket capacity, i.e. how many signals a source may send at once
+            max_pending: Maximum number of admitted signals waiting for or in execution
+            max_sources: Maximum number of source buckets kept in memory
+        """
+        self.secret = secret
+        self.rate = rate
+        self.burst = burst
+        self.max_pending = max_pending
+        self.max_sources = max_sources
+        self.buckets = {}
+        self.pending = 0
+        # Rejections are counted rather than logged per request, so a flood can't push
+        # real trades out of the ApiLogger history
+        self.rejected = {"invalid_secret": 0, "rate_limited": 0, "queue_full": 0}
+        self.lock = threading.Lock()
+        self.execution_lock = threading.Lock()
+
+        if not self.secret:
+            logger.warning("WEBHOOK_SECRET is not set, webhook requests are not authenticated")
+
+    def _take_token(self, source):
+        """Take a token from the source's bucket, returning False if it is empty"""
+        now = time.monotonic()
+        tokens, last = self.buckets.get(source, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+        if tokens < 1:
+            self.buckets[source] = (tokens, now)
+            return False
+
+        self.buckets[source] = (tokens - 1, now)
+
+        # Drop the longest idle buckets once over the limit
+        if len(self.buckets) > self.max_sources:
+            idle = sorted(self.buckets, key=lambda key: self.buckets[key][1])
+            for key in idle[:len(self.buckets) - self.max_sources]:
+                del self.buckets[key]
+        return True
+
+    def check_secret(self, secret):
+        """Check a presented secret, always passing when no secret is configured"""
+        # compare_digest only accepts ASCII str, so compare UTF-8 bytes
+        return not self.secret or hmac.compare_digest(str(secret or '').encode('utf-8'), self.secret.encode('utf-8'))
+
+    def admit(self, source, secret=None):
+        """
+        Decide whether a webhook request may proceed
+
+        An admitted request holds a pending slot until it is passed to execute()
+        or release().
+
+        Args:
+            source: Identifier of the sender (usually the client IP)
+            secret: Secret presented by the sender
+
+        Returns:
+            Decision dict with 'admitted', 'status_code' and 'reason'
+        """
+        if not self.check_secret(secret):
+            with self.lock:
+                self.rejected["invalid_secret"] += 1
+            logger.warning(f"Rejected webhook from {source}: invalid secret")
+            return {"admitted": False, "status_code": 401, "reason": "Invalid webhook secret"}
+
+        with self.lock:
+            if not self._take_token(source):
+                self.rejected["rate_limited"] += 1
+                logger.warning(f"Rejected webhook from {source}: rate limit exceeded")
+                return {"admitted": False, "status_code": 429, "reason": f"Rate limit exceeded for {source}"}
+
+            if self.pending >= self.max_pending:
+                self.rejected["queue_full"] += 1
+                logger.warning(f"Rejected webhook from {source}: {self.pending} signals already pending")
+                return {"admitted": False, "status_code": 429, "reason": "Too many pending signals"}
+
+            self.pending += 1
+
+        return {"admitted": True, "status_code": 200, "reason": "Admitted"}
+
+    def execute(self, func, *args, **kwargs):
+        """
+        Run an admitted signal, one at a time, and release its pending slot
+
+        Args:
+            func: Function to run
+        """
+        try:
+            with self.execution_lock:
+                return func(*args, **kwargs)
+        finally:
+            self.release()
+
+    def release(self):
+        """Release an admitted request's pending slot without running it"""
+        with self.lock:
+            self.pending -= 1
+
+    def get_status(self):
+        """Get current admission state"""
+        with self.lock:
+            return {
+                "authenticated": bool(self.secret),
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "rate": self.rate,
+                "burst": self.burst,
+                "sources": len(self.buckets),
+                "rejected": dict(self.rejected)
+            }
+
+# Create a singleton instance
+admission_controller = AdmissionController(
+    secret=os.environ.get('WEBHOOK_SECRET') or None,
+    rate=float(os.environ.get('WEBHOOK_RATE', '0.2')),
+    burst=int(os.environ.get('WEBHOOK_BURST', '3')),
+    max_pending=int(os.environ.get('WEBHOOK_MAX_PENDING', '2'))
+)
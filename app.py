@@ -1,17 +1,23 @@
 # app.py - Main Flask application with webhook endpoint and dashboard
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response
+from werkzeug.middleware.proxy_fix import ProxyFix
 import logging
 import os
-import json
 import traceback
+import uuid
 from datetime import datetime
 import pytz
 
 # Use direct API implementation
 from tasty_api import TastyTradeAPI as TastyClient
 from binary_search import BinarySearch
+from order_tracker import OrderTracker
 from trading import TradingLogic
 from logger import api_logger
+from admission import admission_controller
+from profiler import request_profiler
+from scheduler import SignalScheduler, market_calendar
+from serialization import UJSONProvider
 
 # Configure logging
 logging.basicConfig(
@@ -24,17 +30,33 @@ logger = logging.getLogger(__name__)
 # Initialize Flask app
 app = Flask(__name__)
 
+# Trust only the X-Forwarded-For entries appended by our own proxies (Render's load balancer),
+# so remote_addr can't be spoofed by a client-supplied header
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.environ.get('TRUSTED_PROXY_HOPS', '1')))
+
+# Log snapshot versions restart with each process, so ETags also carry a per-process token
+etag_token = uuid.uuid4().hex[:12]
+app.json = UJSONProvider(app)
+
 # Initialize these variables at global scope
 tasty_client = None
+order_tracker = None
 binary_search = None
 trading_logic = None
 initialization_error = None
 
+# Signals outside regular market hours are deferred to the next open unless disabled
+market_hours_only = os.environ.get('MARKET_HOURS_ONLY', 'true').lower() in ('1', 'true', 'yes')
+signal_scheduler = SignalScheduler(market_calendar, admission_controller.execution_lock)
+if market_hours_only:
+    logger.warning("Deferred signals are kept in memory only; signals queued before a restart are not fired")
+
 # Try to initialize TastyTrade client and trading logic
 try:
     tasty_client = TastyClient()
-    binary_search = BinarySearch(tasty_client)
-    trading_logic = TradingLogic(tasty_client, binary_search)
+    order_tracker = OrderTracker(tasty_client)
+    binary_search = BinarySearch(tasty_client, order_tracker)
+    trading_logic = TradingLogic(tasty_client, binary_search, order_tracker)
     logger.info("Successfully initialized TastyTrade client and trading logic")
 except Exception as e:
     initialization_error = str(e)
@@ -45,42 +67,73 @@ except Exception as e:
 @app.route('/webhook', methods=['POST'])
 def webhook():
     """Webhook endpoint to receive trading signals"""
+    # Check the secret, rate limit and pending queue first. Rejections are only counted
+    # (see /api/admission) so a flood doesn't fill the ApiLogger history
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    source = request.remote_addr or 'unknown'
+    secret = request.headers.get('X-Webhook-Secret') or data.get('secret')
+    decision = admission_controller.admit(source, secret)
+    if not decision['admitted']:
+        return jsonify({"status": "error", "message": f"Webhook rejected: {decision['reason']}"}), decision['status_code']
+    
+    # The admitted request holds a pending slot until it runs, is deferred or fails
+    slot_held = True
     try:
-        # Log the incoming request
-        request_id = api_logger.log_request('/webhook', 'POST', data=request.json)
+        # Log the incoming request, without the webhook secret
+        logged_data = {key: value for key, value in data.items() if key != 'secret'}
+        request_id = api_logger.log_request('/webhook', 'POST', data=logged_data)
         
-        # Check if trading_logic is initialized
-        if trading_logic is None:
-            error_msg = "Trading logic not initialized. Check server logs for details."
-            if initialization_error:
-                error_msg += f" Error: {initialization_error}"
-            api_logger.log_error(request_id, error_msg)
-            return jsonify({"status": "error", "message": error_msg}), 500
+        # Profile the rest of the handling when profiling is enabled
+        with request_profiler.profile(f"webhook #{request_id}"):
+            # Check if trading_logic is initialized
+            if trading_logic is None:
+                error_msg = "Trading logic not initialized. Check server logs for details."
+                if initialization_error:
+                    error_msg += f" Error: {initialization_error}"
+                api_logger.log_error(request_id, error_msg)
+                return jsonify({"status": "error", "message": error_msg}), 500
         
-        # Parse the signal
-        data = request.json
-        signal = data.get('signal')
+            # Parse the signal
+            signal = data.get('signal')
         
-        if not signal:
-            error_msg = "No signal provided in request"
-            api_logger.log_error(request_id, error_msg)
-            return jsonify({"status": "error", "message": error_msg}), 400
+            if not signal:
+                error_msg = "No signal provided in request"
+                api_logger.log_error(request_id, error_msg)
+                return jsonify({"status": "error", "message": error_msg}), 400
             
-        # Handle the signal
-        if signal.lower() == 'long':
-            trading_logic.handle_long_signal()
-            response = {"status": "success", "message": "Long signal processed successfully"}
-        elif signal.lower() == 'short':
-            trading_logic.handle_short_signal()
-            response = {"status": "success", "message": "Short signal processed successfully"}
-        else:
-            error_msg = f"Unknown signal: {signal}"
-            api_logger.log_error(request_id, error_msg)
-            return jsonify({"status": "error", "message": error_msg}), 400
+            handlers = {
+                'long': trading_logic.handle_long_signal,
+                'short': trading_logic.handle_short_signal
+            }
+            handler = handlers.get(str(signal).lower())
+            if handler is None:
+                error_msg = f"Unknown signal: {signal}"
+                api_logger.log_error(request_id, error_msg)
+                return jsonify({"status": "error", "message": error_msg}), 400
+            
+            # Outside regular hours, keep only the latest signal for the pair and fire it at the open
+            if market_hours_only and not market_calendar.is_open():
+                slot_held = False
+                admission_controller.release()
+                pair = f"{trading_logic.long_symbol}/{trading_logic.short_symbol}"
+                next_open = signal_scheduler.defer(pair, str(signal).lower(), handler)
+                response = {
+                    "status": "deferred",
+                    "message": f"Market closed, {str(signal).lower()} signal deferred until {next_open.strftime('%Y-%m-%d %H:%M %Z')}"
+                }
+                api_logger.log_response(request_id, response, status='deferred')
+                return jsonify(response), 202
+            
+            # Handle the signal
+            slot_held = False
+            admission_controller.execute(handler)
+            response = {"status": "success", "message": f"{str(signal).capitalize()} signal processed successfully"}
             
-        # Log the response
-        api_logger.log_response(request_id, response)
-        return jsonify(response)
+            # Log the response
+            api_logger.log_response(request_id, response)
+            return jsonify(response)
         
     except Exception as e:
         error_msg = f"Error processing webhook: {str(e)}"
@@ -92,6 +145,10 @@ def webhook():
             api_logger.log_error(request_id, error_msg)
             
         return jsonify({"status": "error", "message": error_msg}), 500
+    
+    finally:
+        if slot_held:
+            admission_controller.release()
 
 @app.route('/')
 def dashboard():
@@ -107,9 +164,69 @@ def dashboard():
 
 @app.route('/api/logs')
 def get_logs():
-    """API endpoint to get all logs"""
-    logs = api_logger.get_logs()
-    return jsonify(logs)
+    """API endpoint to get all logs, served from the logger's cached snapshot"""
+    gzipped = 'gzip' in request.headers.get('Accept-Encoding', '')
+    data, version = api_logger.get_logs_snapshot(gzipped=gzipped)
+    
+    response = Response(data, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if gzipped:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(f"logs-{etag_token}-{version}{'-gzip' if gzipped else ''}")
+    return response.make_conditional(request)
+
+@app.route('/api/admission')
+def admission_status():
+    """API endpoint to get webhook admission state"""
+    return jsonify(admission_controller.get_status())
+
+@app.route('/api/scheduler')
+def scheduler_status():
+    """API endpoint to get market session state and deferred signals"""
+    return jsonify({
+        "market_hours_only": market_hours_only,
+        "market_open": market_calendar.is_open(),
+        "next_open": market_calendar.next_open().isoformat(),
+        "deferred": signal_scheduler.get_pending()
+    })
+
+@app.route('/api/orders')
+def get_orders():
+    """API endpoint to get all tracked orders"""
+    if order_tracker is None:
+        return jsonify({"status": "error", "message": "Order tracker not initialized"}), 500
+    return jsonify(order_tracker.get_orders())
+
+@app.route('/api/profiling', methods=['GET', 'POST'])
+def profiling():
+    """API endpoint to view or toggle request profiling"""
+    if request.method == 'POST':
+        # Toggling adds a sampler thread to every webhook, so require the webhook secret
+        if not admission_controller.check_secret(request.headers.get('X-Webhook-Secret')):
+            return jsonify({"status": "error", "message": "Invalid webhook secret"}), 401
+        
+        data = request.get_json(silent=True) or {}
+        if 'enabled' not in data:
+            return jsonify({"status": "error", "message": "Missing 'enabled' in request"}), 400
+        request_profiler.set_enabled(data['enabled'])
+
+    return jsonify({
+        "enabled": request_profiler.enabled,
+        "profiles": request_profiler.get_profiles()
+    })
+
+@app.route('/api/profiles/<profile_id>')
+def get_profile(profile_id):
+    """API endpoint to download a stored profile as collapsed stacks"""
+    collapsed = request_profiler.get_collapsed(profile_id)
+    if collapsed is None:
+        return jsonify({"status": "error", "message": f"Profile not found: {profile_id}"}), 404
+
+    return Response(
+        collapsed,
+        mimetype='text/plain',
+        headers={'Content-Disposition': f'inline; filename=profile-{profile_id}.collapsed'}
+    )
 
 @app.route('/api/status')
 def api_status():
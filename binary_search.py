@@ -6,14 +6,17 @@ import time
 logger = logging.getLogger(__name__)
 
 class BinarySearch:
-    def __init__(self, tasty_client):
+    def __init__(self, tasty_client, order_tracker=None):
         """
         Initialize binary search with TastyTrade client
         
         Args:
             tasty_client: Initialized TastyClient instance
+            order_tracker: Optional OrderTracker that records every probe order
         """
         self.tasty_client = tasty_client
+        self.order_tracker = order_tracker
+        self.last_order_ids = []
         self.initial_max_shares = int(os.environ.get('INITIAL_MAX_SHARES', '5000'))
         
     def find_max_buyable_shares(self, symbol, max_cash_percentage=1.0):
@@ -27,6 +30,9 @@ class BinarySearch:
         Returns:
             Maximum number of whole shares that can be bought
         """
+        # Reset before any early return so callers never see the previous search's orders
+        self.last_order_ids = []
+        
         available_cash = self.tasty_client.get_available_cash()
         max_cash = available_cash * max_cash_percentage
         
@@ -42,12 +48,24 @@ class BinarySearch:
         
         while low <= high:
             mid = (low + high) // 2
+            
+            # Cancel earlier probes that are still unfilled so they don't hold buying power
+            if self.order_tracker and self.last_order_ids:
+                self.order_tracker.poll(self.last_order_ids)
+                self.order_tracker.cancel_stale(self.last_order_ids, max_age=self.order_tracker.probe_stale_seconds)
+            
             logger.info(f"Binary search: Trying to buy {mid} shares of {symbol}")
             
             try:
                 # Try to buy shares
                 response = self.tasty_client.buy_shares(symbol, mid)
                 
+                # Track every placed order, accepted or not, so unfilled ones get cancelled
+                if self.order_tracker:
+                    order_id = self.order_tracker.track(response, symbol, mid)
+                    if order_id is not None:
+                        self.last_order_ids.append(order_id)
+                
                 # Check if order was accepted
                 order_status = response.get('data', {}).get('order', {}).get('status')
                 
@@ -1,10 +1,11 @@
 # logger.py - Custom logger for tracking API calls
 import logging
-import json
 from datetime import datetime
 import pytz
 from collections import deque
 import threading
+import itertools
+from serialization import dumps, compress
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +30,15 @@ class ApiLogger:
         self.logs = deque(maxlen=max_logs)
         self.lock = threading.Lock()
         
+        # Request IDs come from a counter so they stay unique once the deque is full
+        self._ids = itertools.count(1)
+        
+        # Bumped on every change so the encoded snapshot is only rebuilt when needed
+        self.version = 0
+        self._snapshot_version = None
+        self._snapshot = None
+        self._snapshot_gzip = None
+        
     def log_request(self, endpoint, method, data=None, params=None):
         """
         Log an API request
@@ -46,7 +56,6 @@ class ApiLogger:
         timestamp = datetime.now(ist).strftime('%Y-%m-%d %H:%M:%S %Z')
         
         log_entry = {
-            'id': len(self.logs) + 1,
             'timestamp': timestamp,
             'type': 'request',
             'endpoint': endpoint,
@@ -57,7 +66,9 @@ class ApiLogger:
         }
         
         with self.lock:
+            log_entry['id'] = next(self._ids)
             self.logs.append(log_entry)
+            self.version += 1
             
         logger.info(f"API Request: {method} {endpoint}")
         return log_entry['id']
@@ -91,6 +102,7 @@ class ApiLogger:
             
             # Add the response log
             self.logs.append(log_entry)
+            self.version += 1
                     
         logger.info(f"API Response: ID {request_id}, Status: {status}")
         
@@ -109,6 +121,31 @@ class ApiLogger:
         """Get all logs"""
         with self.lock:
             return list(self.logs)
+            
+    def get_logs_snapshot(self, gzipped=False):
+        """
+        Get all logs as pre-encoded JSON
+        
+        The encoded snapshot is cached and only rebuilt after new entries
+        arrive, so repeated polls don't re-serialize the whole log.
+        
+        Args:
+            gzipped: Return the gzip-compressed snapshot
+            
+        Returns:
+            Tuple of (encoded bytes, version)
+        """
+        with self.lock:
+            if self._snapshot_version != self.version:
+                self._snapshot = dumps(list(self.logs)).encode('utf-8')
+                self._snapshot_gzip = None
+                self._snapshot_version = self.version
+                
+            if gzipped and self._snapshot_gzip is None:
+                self._snapshot_gzip = compress(self._snapshot)
+                
+            data = self._snapshot_gzip if gzipped else self._snapshot
+            return data, self._snapshot_version
 
 # Create a singleton instance
 api_logger = ApiLogger()
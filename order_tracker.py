@@ -0,0 +1,205 @@
+# order_tracker.py - Tracks placed orders, polls their status and cancels stale ones
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Order statuses that will not change any more
+TERMINAL_STATUSES = {'Filled', 'Cancelled', 'Rejected', 'Expired', 'Removed', 'Partially Removed'}
+
+class OrderTracker:
+    def __init__(self, tasty_client):
+        """
+        Initialize order tracker with TastyTrade client
+
+        Args:
+            tasty_client: Initialized TastyClient instance
+        """
+        self.tasty_client = tasty_client
+        self.stale_seconds = float(os.environ.get('ORDER_STALE_SECONDS', '10'))
+        self.probe_stale_seconds = float(os.environ.get('ORDER_PROBE_STALE_SECONDS', '0'))
+        self.settle_seconds = float(os.environ.get('ORDER_SETTLE_SECONDS', '3'))
+        self.poll_interval = float(os.environ.get('ORDER_POLL_INTERVAL', '0.5'))
+        self.max_orders = int(os.environ.get('ORDER_TRACKER_MAX_ORDERS', '500'))
+        self.max_age = float(os.environ.get('ORDER_TRACKER_MAX_AGE', '86400'))
+        self.orders = {}
+        self.lock = threading.Lock()
+
+    def track(self, response, symbol, quantity=None):
+        """
+        Record an order returned by buy_shares or close_position
+
+        Args:
+            response: Order response from the API (None is ignored)
+            symbol: Stock symbol of the order
+            quantity: Requested quantity (defaults to the quantity of the order legs)
+
+        Returns:
+            Order ID or None if the response has no order
+        """
+        order = (response or {}).get('data', {}).get('order', {})
+        order_id = order.get('id')
+        if order_id is None:
+            return None
+
+        if quantity is None:
+            quantity = sum(float(leg.get('quantity', 0)) for leg in order.get('legs', []))
+
+        with self.lock:
+            self.orders[order_id] = {
+                'id': order_id,
+                'symbol': symbol,
+                'quantity': float(quantity),
+                'filled': self._filled_quantity(order, quantity),
+                'status': order.get('status'),
+                'placed_at': time.monotonic()
+            }
+            self._evict()
+
+        logger.info(f"Tracking order {order_id}: {quantity} {symbol}, status {order.get('status')}")
+        return order_id
+
+    def _evict(self):
+        """Forget orders past max_age, then the oldest finished (or, failing that, oldest) orders over max_orders"""
+        now = time.monotonic()
+        for order_id in [oid for oid, record in self.orders.items() if now - record['placed_at'] > self.max_age]:
+            del self.orders[order_id]
+
+        if len(self.orders) > self.max_orders:
+            finished = [oid for oid, record in self.orders.items() if record['status'] in TERMINAL_STATUSES]
+            for order_id in finished[:len(self.orders) - self.max_orders]:
+                del self.orders[order_id]
+
+        # Orders are kept in placement order, so the first ones are the oldest
+        while len(self.orders) > self.max_orders:
+            del self.orders[next(iter(self.orders))]
+
+    def _filled_quantity(self, order, quantity):
+        """Sum the fills of an order, falling back to the full quantity for fills without details"""
+        filled = 0.0
+        for leg in order.get('legs', []):
+            for fill in leg.get('fills', []):
+                filled += float(fill.get('quantity', 0))
+
+        if filled == 0 and order.get('status') == 'Filled':
+            return float(quantity)
+        return filled
+
+    def _open_order_ids(self, order_ids=None):
+        """Get IDs of tracked orders that are not in a terminal status"""
+        with self.lock:
+            ids = self.orders.keys() if order_ids is None else order_ids
+            return [
+                order_id for order_id in ids
+                if order_id in self.orders and self.orders[order_id]['status'] not in TERMINAL_STATUSES
+            ]
+
+    def poll(self, order_ids=None):
+        """
+        Refresh the status of open tracked orders
+
+        Uses a single call for all of today's orders and only falls back to
+        per-order requests for orders missing from that response.
+
+        Args:
+            order_ids: Order IDs to refresh (defaults to all open tracked orders)
+        """
+        open_ids = self._open_order_ids(order_ids)
+        if not open_ids:
+            return
+
+        try:
+            live_orders = {order['id']: order for order in self.tasty_client.get_live_orders()}
+        except Exception as e:
+            logger.error(f"Error polling live orders: {str(e)}")
+            live_orders = {}
+
+        for order_id in open_ids:
+            order = live_orders.get(order_id)
+            if order is None:
+                try:
+                    order = self.tasty_client.get_order(order_id)
+                except Exception as e:
+                    logger.error(f"Error polling order {order_id}: {str(e)}")
+                    continue
+
+            with self.lock:
+                record = self.orders[order_id]
+                record['status'] = order.get('status')
+                record['filled'] = self._filled_quantity(order, record['quantity'])
+
+    def cancel_stale(self, order_ids=None, max_age=None):
+        """
+        Cancel open tracked orders older than the stale deadline
+
+        Args:
+            order_ids: Order IDs to consider (defaults to all open tracked orders)
+            max_age: Age in seconds after which an order is stale (defaults to ORDER_STALE_SECONDS)
+        """
+        max_age = self.stale_seconds if max_age is None else max_age
+        now = time.monotonic()
+
+        for order_id in self._open_order_ids(order_ids):
+            with self.lock:
+                record = self.orders[order_id]
+                if now - record['placed_at'] < max_age:
+                    continue
+
+            try:
+                logger.info(f"Cancelling stale order {order_id} ({record['symbol']}, status {record['status']})")
+                order = self.tasty_client.cancel_order(order_id)
+                with self.lock:
+                    record['status'] = order.get('status')
+                    record['filled'] = self._filled_quantity(order, record['quantity'])
+            except Exception as e:
+                logger.error(f"Error cancelling order {order_id}: {str(e)}")
+
+    def settle(self, order_ids):
+        """
+        Wait for orders to reach a terminal status, cancelling any still open at the deadline
+
+        Args:
+            order_ids: Order IDs to settle
+
+        Returns:
+            Total filled quantity across the orders, or None if some orders are
+            still not in a terminal status (e.g. the broker could not be reached)
+            so the fills are unknown
+        """
+        # Kept short because this runs inside the webhook request, after the binary search
+        deadline = time.monotonic() + self.settle_seconds
+
+        while self._open_order_ids(order_ids) and time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            self.poll(order_ids)
+
+        # Cancel whatever did not fill in time, then pick up any partial fills
+        if self._open_order_ids(order_ids):
+            self.cancel_stale(order_ids, max_age=0)
+            self.poll(order_ids)
+
+        unconfirmed = self._open_order_ids(order_ids)
+        if unconfirmed:
+            logger.error(f"Could not confirm final status of orders {unconfirmed}")
+            return None
+
+        return self.filled_quantity(order_ids)
+
+    def sweep(self):
+        """Refresh every open tracked order, cancel the stale ones and drop old records"""
+        self.poll()
+        self.cancel_stale()
+        with self.lock:
+            self._evict()
+
+    def filled_quantity(self, order_ids):
+        """Get the total filled quantity of the given orders"""
+        with self.lock:
+            return sum(self.orders[order_id]['filled'] for order_id in order_ids if order_id in self.orders)
+
+    def get_orders(self):
+        """Get all tracked orders"""
+        with self.lock:
+            return [dict(record) for record in self.orders.values()]
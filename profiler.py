@@ -0,0 +1,159 @@
+# profiler.py - On-demand sampling profiler for the webhook path
+import logging
+import os
+import itertools
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+import pytz
+
+logger = logging.getLogger(__name__)
+
+class RequestProfiler:
+    """Opt-in sampling profiler that stores collapsed stacks per request"""
+
+    def __init__(self, enabled=False, interval=0.005, max_profiles=50):
+        """
+        Initialize request profiler
+
+        Args:
+            enabled: Whether profiling starts enabled
+            interval: Seconds between stack samples
+            max_profiles: Maximum number of profiles to keep in memory
+        """
+        self.enabled = enabled
+        self.interval = interval
+        self.max_profiles = max_profiles
+        self.profiles = OrderedDict()
+        self.lock = threading.Lock()
+        self._active = threading.local()
+        self._ids = itertools.count(1)
+
+    def set_enabled(self, enabled):
+        """Turn profiling on or off"""
+        self.enabled = bool(enabled)
+        logger.info(f"Request profiling {'enabled' if self.enabled else 'disabled'}")
+
+    @contextmanager
+    def profile(self, label):
+        """
+        Sample the current thread's stack for the duration of the block
+
+        Does nothing when profiling is disabled or when the current thread
+        is already being profiled, so nested calls are cheap.
+
+        Args:
+            label: What was profiled (usually a request ID), stored alongside a unique profile ID
+        """
+        if not self.enabled or getattr(self._active, 'profiling', False):
+            yield
+            return
+
+        self._active.profiling = True
+        target = threading.get_ident()
+        samples = Counter()
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample,
+            args=(target, samples, stop),
+            daemon=True
+        )
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            sampler.join()
+            self._active.profiling = False
+            self._store(label, samples, time.perf_counter() - started)
+
+    def _sample(self, target, samples, stop):
+        """Collect stack samples of the target thread until stopped"""
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+
+            samples[';'.join(reversed(stack))] += 1
+
+    def _store(self, label, samples, duration):
+        """Store a finished profile, evicting the oldest past max_profiles"""
+        ist = pytz.timezone('Asia/Kolkata')
+        timestamp = datetime.now(ist).strftime('%Y-%m-%d %H:%M:%S %Z')
+
+        with self.lock:
+            # Labels can repeat (request IDs are reused once the log is full), so key by a counter
+            profile_id = str(next(self._ids))
+            self.profiles[profile_id] = {
+                'id': profile_id,
+                'label': str(label),
+                'timestamp': timestamp,
+                'duration': round(duration, 4),
+                'sample_count': sum(samples.values()),
+                'samples': samples
+            }
+            while len(self.profiles) > self.max_profiles:
+                self.profiles.popitem(last=False)
+
+        logger.info(f"Stored profile {profile_id} for {label} ({duration:.3f}s, {sum(samples.values())} samples)")
+
+    def get_profiles(self):
+        """Get a summary of all stored profiles, without their samples"""
+        with self.lock:
+            return [
+                {key: value for key, value in profile.items() if key != 'samples'}
+                for profile in self.profiles.values()
+            ]
+
+    def get_collapsed(self, profile_id):
+        """
+        Get a stored profile as collapsed stacks
+
+        Args:
+            profile_id: Profile key
+
+        Returns:
+            Collapsed stack text (one "frame;frame count" line per stack) or None if not found
+        """
+        with self.lock:
+            profile = self.profiles.get(str(profile_id))
+            if profile is None:
+                return None
+            samples = profile['samples'].most_common()
+
+        return '\n'.join(f"{stack} {count}" for stack, count in samples) + '\n'
+
+    def profiled(self, name):
+        """
+        Decorator that profiles a function under a fixed label
+
+        Args:
+            name: Label for the stored profiles
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.profile(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+# Create a singleton instance
+request_profiler = RequestProfiler(
+    enabled=os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes'),
+    interval=float(os.environ.get('PROFILING_INTERVAL', '0.005')),
+    max_profiles=int(os.environ.get('PROFILING_MAX_PROFILES', '50'))
+)
@@ -0,0 +1,183 @@
+# scheduler.py - Market-session-aware scheduling of trading signals
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime, time, timedelta
+import pytz
+
+from logger import api_logger
+
+logger = logging.getLogger(__name__)
+
+# NYSE full-day closures; extend via MARKET_HOLIDAYS once these years have passed
+NYSE_HOLIDAYS = {
+    '2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25',
+    '2026-06-19', '2026-07-03', '2026-09-07', '2026-11-26', '2026-12-25',
+    '2027-01-01', '2027-01-18', '2027-02-15', '2027-03-26', '2027-05-31',
+    '2027-06-18', '2027-07-05', '2027-09-06', '2027-11-25', '2027-12-24',
+}
+
+class MarketCalendar:
+    def __init__(self, timezone='America/New_York', open_time=time(9, 30), close_time=time(16, 0), holidays=None):
+        """
+        Initialize exchange calendar for regular trading hours
+
+        Args:
+            timezone: Exchange timezone name
+            open_time: Session open in exchange time
+            close_time: Session close in exchange time
+            holidays: Set of 'YYYY-MM-DD' dates the exchange is closed
+        """
+        self.timezone = pytz.timezone(timezone)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.holidays = set(NYSE_HOLIDAYS if holidays is None else holidays)
+        self.last_holiday_year = max((int(day[:4]) for day in self.holidays), default=0)
+        self._warned_years = set()
+
+    def now(self):
+        """Get the current time in the exchange timezone"""
+        return datetime.now(self.timezone)
+
+    def is_trading_day(self, day):
+        """Check if a date is a weekday that is not a holiday"""
+        if day.year > self.last_holiday_year and day.year not in self._warned_years:
+            self._warned_years.add(day.year)
+            logger.warning(
+                f"No market holidays known for {day.year} (calendar ends {self.last_holiday_year}), "
+                f"holidays will be treated as trading days. Set MARKET_HOLIDAYS to add them."
+            )
+        return day.weekday() < 5 and day.isoformat() not in self.holidays
+
+    def is_open(self, now=None):
+        """
+        Check if the regular session is open
+
+        Args:
+            now: Timezone-aware datetime to check (defaults to now)
+        """
+        now = (now or self.now()).astimezone(self.timezone)
+        return self.is_trading_day(now.date()) and self.open_time <= now.time() < self.close_time
+
+    def next_open(self, now=None):
+        """
+        Get the next session open at or after a given time
+
+        Args:
+            now: Timezone-aware datetime to start from (defaults to now)
+
+        Returns:
+            Timezone-aware datetime of the next open
+        """
+        now = (now or self.now()).astimezone(self.timezone)
+        day = now.date()
+        if now.time() >= self.open_time:
+            day += timedelta(days=1)
+
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+
+        return self.timezone.localize(datetime.combine(day, self.open_time))
+
+class SignalScheduler:
+    """Defers out-of-session signals and fires them in one batch at the next open"""
+
+    def __init__(self, calendar, execution_lock=None):
+        """
+        Initialize signal scheduler
+
+        Args:
+            calendar: MarketCalendar used to decide when signals may run
+            execution_lock: Lock shared with the webhook path so trades never overlap
+        """
+        self.calendar = calendar
+        self.execution_lock = execution_lock or threading.Lock()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        atexit.register(self._warn_pending)
+
+    def defer(self, key, signal, handler):
+        """
+        Queue a signal until the next open, replacing any earlier signal for the same key
+
+        Args:
+            key: Queue key (one signal is kept per key, e.g. per symbol pair)
+            signal: Signal name, for logging
+            handler: Callable that processes the signal
+
+        Returns:
+            Timezone-aware datetime the signal will fire at
+        """
+        with self.lock:
+            replaced = self.pending.get(key)
+            self.pending[key] = (signal, handler)
+
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+        if replaced:
+            logger.info(f"Replaced deferred {replaced[0]} signal for {key} with {signal}")
+        next_open = self.calendar.next_open()
+        logger.info(f"Deferred {signal} signal for {key} until {next_open.strftime('%Y-%m-%d %H:%M %Z')}")
+        self.wake.set()
+        return next_open
+
+    def _run(self):
+        """Wait for the session to open and fire queued signals"""
+        while True:
+            self.wake.clear()
+            if self.calendar.is_open():
+                self.fire_pending()
+
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    return
+
+            # Re-check at least once a minute so clock changes or sleeps don't delay the open
+            wait = (self.calendar.next_open() - self.calendar.now()).total_seconds()
+            self.wake.wait(min(max(wait, 0), 60))
+
+    def fire_pending(self):
+        """Run every queued signal in one batch"""
+        with self.lock:
+            batch = list(self.pending.items())
+            self.pending.clear()
+
+        if not batch:
+            return
+
+        logger.info(f"Session open, firing {len(batch)} deferred signal(s)")
+        with self.execution_lock:
+            for key, (signal, handler) in batch:
+                request_id = api_logger.log_request('/scheduler', 'FIRE', data={'signal': signal, 'pair': key})
+                try:
+                    handler()
+                    api_logger.log_response(request_id, {"status": "success", "message": f"Deferred {signal} signal processed"})
+                except Exception as e:
+                    logger.error(f"Error firing deferred {signal} signal for {key}: {str(e)}")
+                    api_logger.log_error(request_id, f"Error firing deferred signal: {str(e)}")
+
+    def _warn_pending(self):
+        """Warn at shutdown about deferred signals that will be lost"""
+        pending = self.get_pending()
+        if pending:
+            logger.warning(f"Shutting down with {len(pending)} deferred signal(s) that will not be fired: {pending}")
+
+    def get_pending(self):
+        """Get queued signals by key"""
+        with self.lock:
+            return {key: signal for key, (signal, _) in self.pending.items()}
+
+def _calendar_from_env():
+    """Build the market calendar, adding any MARKET_HOLIDAYS from the environment"""
+    extra = os.environ.get('MARKET_HOLIDAYS', '')
+    holidays = NYSE_HOLIDAYS | {day.strip() for day in extra.split(',') if day.strip()}
+    return MarketCalendar(holidays=holidays)
+
+# Create a singleton instance
+market_calendar = _calendar_from_env()
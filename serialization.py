@@ -0,0 +1,42 @@
+# serialization.py - Fast JSON encoding shared by the app, logger and API client
+import gzip
+import ujson
+from flask.json.provider import DefaultJSONProvider
+
+def dumps(obj, **kwargs):
+    """
+    Encode an object as a JSON string using ujson
+
+    Args:
+        obj: Object to encode
+        **kwargs: Extra ujson.dumps options
+
+    Returns:
+        JSON string
+    """
+    kwargs.setdefault('ensure_ascii', False)
+    kwargs.setdefault('escape_forward_slashes', False)
+    kwargs.setdefault('default', DefaultJSONProvider.default)
+    return ujson.dumps(obj, **kwargs)
+
+def loads(s):
+    """Decode a JSON string or bytes using ujson"""
+    return ujson.loads(s)
+
+def compress(data):
+    """Gzip-compress encoded JSON for responses that accept gzip"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return gzip.compress(data, compresslevel=6)
+
+class UJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that makes jsonify and request.json use ujson"""
+
+    def dumps(self, obj, **kwargs):
+        # ujson has no separators option and always encodes compactly
+        kwargs.pop('separators', None)
+        kwargs.pop('default', None)
+        return dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return loads(s)
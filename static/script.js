@@ -5,12 +5,17 @@ document.addEventListener('DOMContentLoaded', function() {
     const totalRequestsEl = document.getElementById('total-requests');
     const successfulRequestsEl = document.getElementById('successful-requests');
     const failedRequestsEl = document.getElementById('failed-requests');
+    const rejectedWebhooksEl = document.getElementById('rejected-webhooks');
     
     // Filters
     const showRequestsCheckbox = document.getElementById('show-requests');
     const showResponsesCheckbox = document.getElementById('show-responses');
     const showErrorsCheckbox = document.getElementById('show-errors');
     
+    // Profiling
+    const profilesContainer = document.getElementById('profiles');
+    const profilingCheckbox = document.getElementById('profiling-enabled');
+    
     // Stats
     let totalRequests = 0;
     let successfulRequests = 0;
@@ -73,7 +78,8 @@ document.addEventListener('DOMContentLoaded', function() {
             const typeBadge = document.createElement('span');
             typeBadge.className = `log-type ${log.type === 'request' ? 'request' : log.status}`;
             typeBadge.textContent = log.type === 'request' ? 'Request' : 
-                                   (log.status === 'error' ? 'Error' : 'Response');
+                                   (log.status === 'error' ? 'Error' :
+                                   (log.status === 'deferred' ? 'Deferred' : 'Response'));
             logHeader.appendChild(typeBadge);
             
             logEntry.appendChild(logHeader);
@@ -90,7 +96,8 @@ document.addEventListener('DOMContentLoaded', function() {
                     logSummary.textContent += ` - Signal: ${log.data.signal}`;
                 }
             } else {
-                logSummary.textContent = log.status === 'error' ? 'Error Response' : 'Success Response';
+                logSummary.textContent = log.status === 'error' ? 'Error Response' :
+                                         (log.status === 'deferred' ? 'Deferred Until Market Open' : 'Success Response');
             }
             
             logEntry.appendChild(logSummary);
@@ -215,14 +222,109 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    // Function to fetch admission counters (rejected webhooks are not in the logs)
+    async function fetchAdmission() {
+        try {
+            const response = await fetch('/api/admission');
+            if (!response.ok) {
+                throw new Error('Failed to fetch admission state');
+            }
+            
+            const admission = await response.json();
+            rejectedWebhooksEl.textContent = Object.values(admission.rejected).reduce((a, b) => a + b, 0);
+        } catch (error) {
+            console.error('Error fetching admission state:', error);
+        }
+    }
+    
+    // Function to render profiling state and stored profiles
+    function renderProfiling(profiling) {
+        profilingCheckbox.checked = profiling.enabled;
+        profilesContainer.innerHTML = '';
+        
+        if (profiling.profiles.length === 0) {
+            profilesContainer.textContent = 'No profiles stored';
+            return;
+        }
+        
+        // Newest profiles first
+        profiling.profiles.slice().reverse().forEach(profile => {
+            const profileEntry = document.createElement('div');
+            profileEntry.className = 'profile-entry';
+            
+            const link = document.createElement('a');
+            link.href = `/api/profiles/${encodeURIComponent(profile.id)}`;
+            link.target = '_blank';
+            link.textContent = `#${profile.id} ${profile.label}`;
+            profileEntry.appendChild(link);
+            
+            const summary = document.createElement('span');
+            summary.className = 'log-timestamp';
+            summary.textContent = `${profile.timestamp} - ${profile.duration}s, ${profile.sample_count} samples`;
+            profileEntry.appendChild(summary);
+            
+            profilesContainer.appendChild(profileEntry);
+        });
+    }
+    
+    // Function to fetch profiling state
+    async function fetchProfiling() {
+        try {
+            const response = await fetch('/api/profiling');
+            if (!response.ok) {
+                throw new Error('Failed to fetch profiling state');
+            }
+            
+            renderProfiling(await response.json());
+        } catch (error) {
+            console.error('Error fetching profiling state:', error);
+        }
+    }
+    
+    // Function to toggle profiling, asking for the webhook secret if the server requires it
+    async function toggleProfiling() {
+        try {
+            const request = () => fetch('/api/profiling', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-Webhook-Secret': sessionStorage.getItem('webhookSecret') || ''
+                },
+                body: JSON.stringify({enabled: profilingCheckbox.checked})
+            });
+            
+            let response = await request();
+            if (response.status === 401) {
+                const secret = window.prompt('Webhook secret');
+                if (secret !== null) {
+                    sessionStorage.setItem('webhookSecret', secret);
+                    response = await request();
+                }
+            }
+            if (!response.ok) {
+                throw new Error('Failed to toggle profiling');
+            }
+            
+            renderProfiling(await response.json());
+        } catch (error) {
+            console.error('Error toggling profiling:', error);
+            fetchProfiling();
+        }
+    }
+    
     // Add event listeners for filters
     showRequestsCheckbox.addEventListener('change', applyFilters);
     showResponsesCheckbox.addEventListener('change', applyFilters);
     showErrorsCheckbox.addEventListener('change', applyFilters);
+    profilingCheckbox.addEventListener('change', toggleProfiling);
     
     // Initial fetch
     fetchLogs();
+    fetchProfiling();
+    fetchAdmission();
     
     // Set up polling to refresh logs every 5 seconds
     setInterval(fetchLogs, 5000);
+    setInterval(fetchProfiling, 5000);
+    setInterval(fetchAdmission, 5000);
 });
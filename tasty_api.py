@@ -2,9 +2,9 @@
 import logging
 import os
 import requests
-import json
 import time
 import re
+from serialization import dumps
 
 logger = logging.getLogger(__name__)
 
@@ -43,10 +43,10 @@ class TastyTradeAPI:
             
             response = self.session.post(
                 login_url,
-                json={
+                data=dumps({
                     "login": self.login_email,
                     "password": self.password
-                }
+                }).encode('utf-8')
             )
             response.raise_for_status()
             
@@ -121,7 +121,7 @@ class TastyTradeAPI:
             logger.info(f"Buying {quantity} shares of {symbol}")
             response = self.session.post(
                 f"{self.base_url}/accounts/{self.account_number}/orders",
-                json=order_data
+                data=dumps(order_data).encode('utf-8')
             )
             response.raise_for_status()
             return response.json()
@@ -172,7 +172,7 @@ class TastyTradeAPI:
             logger.info(f"Closing position for {symbol} with {action} for {quantity} shares")
             response = self.session.post(
                 f"{self.base_url}/accounts/{self.account_number}/orders",
-                json=order_data
+                data=dumps(order_data).encode('utf-8')
             )
             response.raise_for_status()
             return response.json()
@@ -180,6 +180,39 @@ class TastyTradeAPI:
             logger.error(f"Error closing position: {str(e)}")
             raise
             
+    def get_live_orders(self):
+        """Get all orders that are live or were updated today"""
+        response = self.session.get(f"{self.base_url}/accounts/{self.account_number}/orders/live")
+        response.raise_for_status()
+        return response.json()['data']['items']
+    
+    def get_order(self, order_id):
+        """Get a single order by ID"""
+        response = self.session.get(f"{self.base_url}/accounts/{self.account_number}/orders/{order_id}")
+        response.raise_for_status()
+        return response.json()['data']
+    
+    def cancel_order(self, order_id):
+        """
+        Cancel an open order
+        
+        Args:
+            order_id: ID of the order to cancel
+            
+        Returns:
+            Cancelled order
+        """
+        try:
+            logger.info(f"Cancelling order {order_id}")
+            response = self.session.delete(
+                f"{self.base_url}/accounts/{self.account_number}/orders/{order_id}"
+            )
+            response.raise_for_status()
+            return response.json()['data']
+        except Exception as e:
+            logger.error(f"Error cancelling order: {str(e)}")
+            raise
+            
     def get_available_cash(self):
         """Get available cash in the account"""
         balance = self.get_account_balance()
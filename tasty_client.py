@@ -133,6 +133,34 @@ class TastyClient:
             logger.error(f"Error closing position: {str(e)}")
             raise
             
+    def get_live_orders(self):
+        """Get all orders that are live or were updated today"""
+        response = self.client.api.get(f'/accounts/{self.account_number}/orders/live')
+        return response['data']['items']
+    
+    def get_order(self, order_id):
+        """Get a single order by ID"""
+        response = self.client.api.get(f'/accounts/{self.account_number}/orders/{order_id}')
+        return response['data']
+    
+    def cancel_order(self, order_id):
+        """
+        Cancel an open order
+        
+        Args:
+            order_id: ID of the order to cancel
+            
+        Returns:
+            Cancelled order
+        """
+        try:
+            logger.info(f"Cancelling order {order_id}")
+            response = self.client.api.delete(f'/accounts/{self.account_number}/orders/{order_id}')
+            return response['data']
+        except Exception as e:
+            logger.error(f"Error cancelling order: {str(e)}")
+            raise
+            
     def get_available_cash(self):
         """Get available cash in the account"""
         balance = self.get_account_balance()
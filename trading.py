@@ -1,22 +1,27 @@
 # trading.py - Trading logic for handling signals
 import logging
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
+import pytz
+from profiler import request_profiler
 
 logger = logging.getLogger(__name__)
 
 class TradingLogic:
-    def __init__(self, tasty_client, binary_search):
+    def __init__(self, tasty_client, binary_search, order_tracker=None):
         """
         Initialize trading logic with TastyTrade client and binary search
         
         Args:
             tasty_client: Initialized TastyClient instance
             binary_search: Initialized BinarySearch instance
+            order_tracker: Optional OrderTracker used to confirm actual fills
         """
         self.tasty_client = tasty_client
         self.binary_search = binary_search
+        self.order_tracker = order_tracker
         self.last_successful_buy = None
+        self._last_buy_monotonic = None
         self.lockout_hours = 12
         
         # Stock symbols
@@ -30,21 +35,25 @@ class TradingLogic:
         Returns:
             bool: True if in lockout period, False otherwise
         """
-        if not self.last_successful_buy:
+        if self._last_buy_monotonic is None:
             return False
             
-        now = datetime.now()
-        lockout_end = self.last_successful_buy + timedelta(hours=self.lockout_hours)
+        # Measure on the monotonic clock so wall-clock or timezone changes can't shift the lockout
+        remaining = self.lockout_hours * 3600 - (time.monotonic() - self._last_buy_monotonic)
         
-        if now < lockout_end:
-            remaining = lockout_end - now
-            hours, remainder = divmod(remaining.seconds, 3600)
+        if remaining > 0:
+            hours, remainder = divmod(int(remaining), 3600)
             minutes, _ = divmod(remainder, 60)
             logger.info(f"In lockout period. {hours} hours and {minutes} minutes remaining")
             return True
             
         return False
     
+    def _record_successful_buy(self):
+        """Start the lockout period from now"""
+        self._last_buy_monotonic = time.monotonic()
+        self.last_successful_buy = datetime.now(pytz.timezone('Asia/Kolkata'))
+    
     def _close_position(self, symbol):
         """
         Close a specific position
@@ -53,7 +62,34 @@ class TradingLogic:
             symbol: Stock symbol to close
         """
         logger.info(f"Closing position for {symbol}")
-        self.tasty_client.close_position(symbol)
+        response = self.tasty_client.close_position(symbol)
+        if self.order_tracker:
+            self.order_tracker.track(response, symbol)
+    
+    def _buy_max_shares(self, symbol):
+        """
+        Buy as many shares as possible and return the quantity actually filled
+        
+        Without an order tracker, or when the tracker cannot confirm the fills,
+        the quantity accepted by the binary search is assumed to have filled.
+        
+        Args:
+            symbol: Stock symbol to buy
+        """
+        shares_bought = self.binary_search.find_max_buyable_shares(symbol)
+        
+        if self.order_tracker and self.binary_search.last_order_ids:
+            filled = self.order_tracker.settle(self.binary_search.last_order_ids)
+            if filled is None:
+                # An unknown fill is not a zero fill; fall back to what the search accepted
+                logger.error(f"Could not confirm fills for {symbol}, assuming the {shares_bought} shares accepted by the binary search")
+                return shares_bought
+            
+            filled = int(filled)
+            logger.info(f"Binary search accepted up to {shares_bought} shares of {symbol}, {filled} actually filled")
+            return filled
+            
+        return shares_bought
     
     def _close_all_positions(self):
         """Close both MSTU and MSTZ positions"""
@@ -61,6 +97,15 @@ class TradingLogic:
         self._close_position(self.long_symbol)
         self._close_position(self.short_symbol)
         
+        if self.order_tracker:
+            self.order_tracker.poll()
+    
+    def _sweep_orders(self):
+        """Refresh tracked orders (including earlier close orders) and cancel stale ones"""
+        if self.order_tracker:
+            self.order_tracker.sweep()
+        
+    @request_profiler.profiled('long_signal')
     def handle_long_signal(self):
         """
         Handle a long signal
@@ -69,6 +114,7 @@ class TradingLogic:
         Otherwise: buy max MSTU, pause 1s, close MSTZ
         """
         logger.info("Handling long signal")
+        self._sweep_orders()
         
         # If in lockout period, close all positions and return
         if self._is_in_lockout_period():
@@ -77,12 +123,12 @@ class TradingLogic:
             return
         
         # Use binary search to buy as many MSTU shares as possible
-        shares_bought = self.binary_search.find_max_buyable_shares(self.long_symbol)
+        shares_bought = self._buy_max_shares(self.long_symbol)
         
         # Check if shares were successfully bought
         if shares_bought > 0:
             logger.info(f"Successfully bought {shares_bought} shares of {self.long_symbol}")
-            self.last_successful_buy = datetime.now()
+            self._record_successful_buy()
             
             # Pause 1 second after buying
             logger.info("Pausing for 1 second")
@@ -94,6 +140,7 @@ class TradingLogic:
         else:
             logger.warning(f"Failed to buy any shares of {self.long_symbol}")
                 
+    @request_profiler.profiled('short_signal')
     def handle_short_signal(self):
         """
         Handle a short signal
@@ -102,6 +149,7 @@ class TradingLogic:
         Otherwise: buy max MSTZ, pause 1s, close MSTU
         """
         logger.info("Handling short signal")
+        self._sweep_orders()
         
         # If in lockout period, close all positions and return
         if self._is_in_lockout_period():
@@ -110,12 +158,12 @@ class TradingLogic:
             return
             
         # Use binary search to buy as many MSTZ shares as possible
-        shares_bought = self.binary_search.find_max_buyable_shares(self.short_symbol)
+        shares_bought = self._buy_max_shares(self.short_symbol)
         
         # Check if shares were successfully bought
         if shares_bought > 0:
             logger.info(f"Successfully bought {shares_bought} shares of {self.short_symbol}")
-            self.last_successful_buy = datetime.now()
+            self._record_successful_buy()
             
             # Pause 1 second after buying
             logger.info("Pausing for 1 second")